@@ -1,27 +1,76 @@
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, ProcessingInstruction
+import codecs
 import re
 
 
 class EpubCleaner:
-    def __init__(self, html_content):
+    # Longest BOMs first: the UTF-32 LE BOM starts with the UTF-16 LE one
+    BOMS = [
+        (codecs.BOM_UTF32_LE, "utf-32-le"),
+        (codecs.BOM_UTF32_BE, "utf-32-be"),
+        (codecs.BOM_UTF8, "utf-8"),
+        (codecs.BOM_UTF16_LE, "utf-16-le"),
+        (codecs.BOM_UTF16_BE, "utf-16-be"),
+    ]
+
+    # Legacy CJK charsets are often declared by their narrower name
+    # while the text uses characters from the superset.
+    ENCODING_SUPERSETS = {"gb2312": "gb18030", "gbk": "gb18030", "big5": "big5hkscs"}
+
+    def __init__(self, html_content, image_resolver=None):
         """
         Initialize with HTML content (bytes or str).
+        image_resolver: optional callable(src) -> link target or None.
+        When given, images become Markdown image links instead of text.
         """
-        content_str = ""
+        self.image_resolver = image_resolver
+
         if isinstance(html_content, bytes):
-            # Try decoding utf-8, usually EPUB is utf-8
-            try:
-                content_str = html_content.decode("utf-8")
-            except UnicodeDecodeError:
-                # Fallback
-                content_str = html_content.decode("latin-1", errors="ignore")
+            # Let BeautifulSoup decode the bytes once, with the encoding
+            # sniffed from the first bytes (BOM / XML declaration / meta).
+            self.soup = BeautifulSoup(
+                html_content,
+                "html.parser",
+                from_encoding=self._detect_encoding(html_content[:1024]),
+            )
         else:
-            content_str = str(html_content)
+            self.soup = BeautifulSoup(str(html_content), "html.parser")
 
-        # Remove XML declaration pattern <?xml ... ?>
-        content_str = re.sub(r"<\?xml[^>]*\?>", "", content_str, flags=re.IGNORECASE)
+        self._remove_xml_declaration()
 
-        self.soup = BeautifulSoup(content_str, "html.parser")
+    @classmethod
+    def _detect_encoding(cls, head):
+        """
+        Detect the document encoding from the first bytes only.
+        Order: BOM -> XML declaration -> meta charset -> UTF-8 (EPUB default).
+        """
+        for bom, encoding in cls.BOMS:
+            if head.startswith(bom):
+                return encoding
+
+        match = re.match(
+            rb"\s*<\?xml[^>]*?encoding\s*=\s*[\"']([A-Za-z0-9._:-]+)", head, re.IGNORECASE
+        ) or re.search(
+            rb"<meta[^>]*?charset\s*=\s*[\"']?([A-Za-z0-9._:-]+)", head, re.IGNORECASE
+        )
+        if match:
+            try:
+                encoding = codecs.lookup(match.group(1).decode("ascii")).name
+            except LookupError:
+                encoding = None
+            if encoding:
+                return cls.ENCODING_SUPERSETS.get(encoding, encoding)
+
+        return "utf-8"
+
+    def _remove_xml_declaration(self):
+        """
+        Remove the <?xml ... ?> declaration. It is parsed as a top-level
+        processing instruction, so there is no need to rewrite the document.
+        """
+        for node in list(self.soup.contents):
+            if isinstance(node, ProcessingInstruction) and node.lower().startswith("xml"):
+                node.extract()
 
     def clean(self):
         """
@@ -69,11 +118,26 @@ class EpubCleaner:
         """
         Convert <img> tags to text representations.
         Format: [圖片說明: Alt Text] or [圖片]
+        With an image_resolver: ![Alt Text](link) when the image resolves.
         """
         for img in self.soup.find_all("img"):
             alt_text = img.get("alt", "").strip()
 
-            if alt_text:
+            # Links inside code blocks are shown literally, never as images,
+            # so those keep the text placeholder (and nothing is extracted).
+            link = None
+            if (
+                self.image_resolver
+                and img.get("src")
+                and img.find_parent(["pre", "code"]) is None
+            ):
+                link = self.image_resolver(img["src"])
+
+            if link:
+                # Brackets would end the link text early
+                alt_text = alt_text.replace("[", "").replace("]", "")
+                replacement_text = f" ![{alt_text}]({link}) "
+            elif alt_text:
                 replacement_text = f" [圖片說明: {alt_text}] "
             else:
                 replacement_text = " [圖片] "
@@ -1,3 +1,4 @@
+from bs4 import Comment, Doctype, Tag
 from markdownify import MarkdownConverter
 import re
 
@@ -8,9 +9,17 @@ class CustomMarkdownConverter(MarkdownConverter):
     1. Remove internal links but keep text.
     2. Keep external links.
     3. Ensure code blocks are preserved (markdownify default usually works).
-    4. Handle tables (markdownify default works).
+    4. Convert tables in a single pass (see `_convert_table`), with
+       colspan/rowspan support.
     """
 
+    def process_tag(self, node, parent_tags=None):
+        # Tables bypass the generic child-first recursion: rows are built
+        # directly from the cells, so large data tables stay linear.
+        if node.name == "table":
+            return self._convert_table(node, parent_tags or set())
+        return super().process_tag(node, parent_tags)
+
     def convert_a(self, el, text, *args, **kwargs):
         href = el.get("href")
         if not href:
@@ -27,7 +36,124 @@ class CustomMarkdownConverter(MarkdownConverter):
         # Internal link (anchor or relative file) -> return Just Text
         return text
 
-    # We can override convert_table etc. if needed, but default is good start.
+    def convert_td(self, el, text, *args, **kwargs):
+        # Parse colspan with `_span`, the same way `_convert_table` advances
+        # its column counter, so the cell string and column count agree.
+        colspan = self._span(el, "colspan", 1000)
+        return " " + text.strip().replace("\n", " ") + " |" * colspan
+
+    convert_th = convert_td
+
+    def _convert_table(self, table, parent_tags):
+        """
+        Build a Markdown table in one pass over the rows.
+        Each row is rendered once into a short list of cell strings;
+        cells covered by a rowspan from an earlier row become empty cells.
+        """
+        row_tags = set(parent_tags) | {"table", "tbody", "tr"}
+        cell_tags = row_tags | {"_inline"}
+        caption = ""
+        rows = []  # (cell strings, column count)
+        header = False
+        pending = {}  # column index -> rows still covered by a rowspan
+        width = 0
+
+        for tr, in_thead in self._iter_table_rows(table):
+            if tr.name == "caption":
+                caption = super().process_tag(tr, row_tags).strip()
+                continue
+
+            cells = []
+            col = 0
+            all_th = True
+            for cell in tr.children:
+                if not isinstance(cell, Tag) or cell.name not in ("td", "th"):
+                    continue
+                while col in pending:
+                    cells.append(" |")
+                    col = self._consume_rowspan(pending, col)
+                all_th = all_th and cell.name == "th"
+                colspan = self._span(cell, "colspan", 1000)
+                rowspan = self._span(cell, "rowspan", 65534)
+                cells.append(self._convert_cell(cell, row_tags, cell_tags))
+                if rowspan > 1:
+                    for c in range(col, col + colspan):
+                        pending[c] = rowspan - 1
+                col += colspan
+            # Trailing columns still covered by rowspans from above
+            for c in sorted(c for c in pending if c >= col):
+                cells.append(" |" * (c - col + 1))
+                col = self._consume_rowspan(pending, c)
+
+            if not rows:
+                header = in_thead or (all_th and col > 0)
+            rows.append((cells, col))
+            width = max(width, col)
+
+        if not rows:
+            return "\n\n" + caption + "\n\n" if caption else ""
+
+        separator = "| " + " | ".join(["---"] * width) + " |"
+        lines = []
+        if caption:
+            lines.append(caption + "\n")
+        if not header:
+            lines.append("| " + " | ".join([""] * width) + " |")
+            lines.append(separator)
+        for i, (cells, cols) in enumerate(rows):
+            lines.append("|" + "".join(cells) + " |" * (width - cols))
+            if i == 0 and header:
+                lines.append(separator)
+
+        return "\n\n" + "\n".join(lines) + "\n\n"
+
+    def _convert_cell(self, cell, row_tags, cell_tags):
+        """
+        Convert one td/th. Text-only cells (the bulk of data tables) skip
+        the generic tag recursion and go straight to text processing.
+        """
+        texts = []
+        for child in cell.children:
+            if isinstance(child, Tag):
+                return super().process_tag(cell, row_tags)
+            if not isinstance(child, (Comment, Doctype)):
+                texts.append(self.process_text(child, cell_tags))
+        return self.get_conv_fn_cached(cell.name)(
+            cell, "".join(texts), parent_tags=row_tags
+        )
+
+    @staticmethod
+    def _iter_table_rows(table):
+        """
+        Yield (tr, in_thead) for the rows of this table only (not nested
+        tables), plus the caption element if present.
+        """
+        for child in table.children:
+            if not isinstance(child, Tag):
+                continue
+            if child.name == "tr":
+                yield child, False
+            elif child.name in ("thead", "tbody", "tfoot"):
+                for tr in child.children:
+                    if isinstance(tr, Tag) and tr.name == "tr":
+                        yield tr, child.name == "thead"
+            elif child.name == "caption":
+                yield child, False
+
+    @staticmethod
+    def _span(cell, attr, limit):
+        value = cell.get(attr, "")
+        if isinstance(value, str) and value.strip().isdigit():
+            return max(1, min(limit, int(value)))
+        return 1
+
+    @staticmethod
+    def _consume_rowspan(pending, col):
+        """Use up one row of the rowspan at `col` and return the next column."""
+        pending[col] -= 1
+        if pending[col] <= 0:
+            del pending[col]
+        return col + 1
 
 
 class EpubConverter:
@@ -0,0 +1,214 @@
+import re
+import sqlite3
+import zlib
+
+# Mersenne prime used for the MinHash permutations (a * h + b) mod p
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class BoilerplateIndex:
+    """
+    Persistent, corpus-wide index of paragraph fingerprints (MinHash + LSH).
+
+    Each paragraph is reduced to a MinHash signature over character shingles
+    (works for CJK text without word segmentation). The signature is split
+    into bands. SQLite keeps one row per (band, book) plus a per-band count
+    of distinct books, so converting a book again never inflates the count.
+    Memory use is bounded by one paragraph at a time, and each lookup is a
+    primary-key probe per band, independent of corpus size in practice.
+    """
+
+    def __init__(self, db_path, num_perm=32, bands=8, shingle_size=5):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # Fixed seeds so signatures are stable across runs and machines
+        self._perms = [
+            (
+                (i * 0x9E3779B1 + 1) % _MERSENNE_PRIME,
+                (i * 0x85EBCA77 + 7) % _MERSENNE_PRIME,
+            )
+            for i in range(1, num_perm + 1)
+        ]
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS band_counts (
+                band_key INTEGER PRIMARY KEY,
+                book_count INTEGER NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS band_books (
+                band_key INTEGER NOT NULL,
+                book_id TEXT NOT NULL,
+                PRIMARY KEY (band_key, book_id)
+            ) WITHOUT ROWID
+            """
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def band_keys(self, text):
+        """
+        Compute the LSH band keys of a paragraph.
+        Returns:
+            list[int]: one signed 64-bit key per band (empty for blank text).
+        """
+        normalized = re.sub(r"\s+", " ", text).strip().lower()
+        if not normalized:
+            return []
+
+        k = self.shingle_size
+        shingles = {
+            zlib.crc32(normalized[i : i + k].encode("utf-8"))
+            for i in range(max(1, len(normalized) - k + 1))
+        }
+
+        signature = [
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in shingles)
+            for a, b in self._perms
+        ]
+
+        keys = []
+        r = self.rows_per_band
+        for band in range(self.bands):
+            chunk = signature[band * r : (band + 1) * r]
+            data = band.to_bytes(2, "little") + b"".join(
+                v.to_bytes(4, "little") for v in chunk
+            )
+            # Combine two CRCs into a 64-bit key; SQLite integers are signed
+            key = (zlib.crc32(data) << 32) | zlib.crc32(data[::-1])
+            keys.append(key - (1 << 63))
+        return keys
+
+    def seen_count(self, keys, book_id=None):
+        """
+        Return the highest number of distinct books sharing any of the bands,
+        not counting `book_id` itself.
+        """
+        best = 0
+        for key in keys:
+            row = self.conn.execute(
+                "SELECT book_count FROM band_counts WHERE band_key = ?", (key,)
+            ).fetchone()
+            if not row:
+                continue
+            count = row[0]
+            if book_id is not None and self._has_book(key, book_id):
+                count -= 1
+            best = max(best, count)
+        return best
+
+    def add(self, keys, book_id):
+        """
+        Record the bands for `book_id`.
+        The count of a band only grows the first time a given book adds it.
+        """
+        for key in keys:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO band_books (band_key, book_id) VALUES (?, ?)",
+                (key, book_id),
+            )
+            if cursor.rowcount == 1:
+                self.conn.execute(
+                    """
+                    INSERT INTO band_counts (band_key, book_count) VALUES (?, 1)
+                    ON CONFLICT(band_key) DO UPDATE SET book_count = book_count + 1
+                    """,
+                    (key,),
+                )
+
+    def _has_book(self, key, book_id):
+        return (
+            self.conn.execute(
+                "SELECT 1 FROM band_books WHERE band_key = ? AND book_id = ?",
+                (key, book_id),
+            ).fetchone()
+            is not None
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+
+class BoilerplateFilter:
+    """
+    Optional post-processing stage for the Markdown produced by
+    `EpubConverter.convert`. Paragraphs already recorded for at least
+    `min_books` other books are dropped or flagged. The book being filtered
+    is never counted, so a paragraph gets the same decision in every
+    chapter of the book and on every re-run.
+    """
+
+    FLAG = "<!-- boilerplate -->"
+
+    def __init__(self, index, min_books=3, mode="drop", min_length=40):
+        if mode not in ("drop", "flag"):
+            raise ValueError(f"Unknown boilerplate mode: {mode}")
+        if min_books < 1:
+            raise ValueError(f"min_books must be at least 1, got {min_books}")
+
+        self.index = index
+        self.min_books = min_books
+        self.mode = mode
+        self.min_length = min_length
+
+    def filter(self, markdown, book_id):
+        """
+        Filter one chapter of Markdown and record its paragraphs in the index.
+        Returns:
+            str: the Markdown with boilerplate paragraphs dropped or flagged.
+        """
+        output = []
+        in_fence = False
+
+        for block in markdown.split("\n\n"):
+            fence_count = block.count("```")
+            if in_fence or fence_count or not self._is_candidate(block):
+                output.append(block)
+            else:
+                keys = self.index.band_keys(block)
+                is_boilerplate = self.index.seen_count(keys, book_id) >= self.min_books
+                self.index.add(keys, book_id)
+
+                if not is_boilerplate:
+                    output.append(block)
+                elif self.mode == "flag":
+                    output.append(f"{self.FLAG}\n{block}")
+
+            # Code fences may span blank lines; leave their content untouched
+            if fence_count % 2 == 1:
+                in_fence = not in_fence
+
+        self.index.commit()
+        return "\n\n".join(output)
+
+    def _is_candidate(self, block):
+        """
+        Headings, separators, code and short lines are never treated as
+        boilerplate: "# Chapter 1" legitimately appears in every book.
+        """
+        stripped = block.strip()
+        if len(stripped) < self.min_length:
+            return False
+        if stripped.startswith(("#", "---")):
+            return False
+        return True
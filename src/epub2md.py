@@ -1,9 +1,15 @@
 import os
 import re
+import argparse
 import datetime
+import pathlib
+from functools import partial
+from urllib.parse import quote
 from extractor import EpubExtractor
 from cleaner import EpubCleaner
 from converter import EpubConverter
+from deduplicator import BoilerplateIndex, BoilerplateFilter
+from image_extractor import ImageExtractor
 
 
 def sanitize_filename(name):
@@ -14,9 +20,16 @@ def sanitize_filename(name):
     return name.strip()
 
 
-def generate_markdown_content(epub_path):
+def generate_markdown_content(
+    epub_path, boilerplate_filter=None, assets_dir=None, assets_link_prefix="assets"
+):
     """
     Core function to generate markdown content from EPUB.
+    If `boilerplate_filter` (BoilerplateFilter) is given, paragraphs already
+    seen across the corpus are dropped or flagged after conversion.
+    If `assets_dir` is given, images are extracted there and linked as
+    `assets_link_prefix/<file>` instead of being replaced by text
+    (`assets_link_prefix` is a URL path, see `get_assets_link_prefix`).
     Returns:
         tuple: (full_markdown_text: str, filename: str)
     """
@@ -38,6 +51,13 @@ def generate_markdown_content(epub_path):
 
     converter = EpubConverter()
 
+    images = None
+    if assets_dir:
+        try:
+            images = ImageExtractor(epub_path, assets_dir, assets_link_prefix)
+        except Exception as e:
+            print(f"Warning: Image extraction disabled: {e}")
+
     full_markdown_content = []
 
     # Add Front Matter
@@ -56,12 +76,17 @@ def generate_markdown_content(epub_path):
     for content, toc_title, href in extractor.get_spine_items():
         try:
             # 1. Clean
-            cleaner = EpubCleaner(content)
+            resolver = partial(images.submit, chapter_href=href) if images else None
+            cleaner = EpubCleaner(content, image_resolver=resolver)
             soup = cleaner.clean()
 
             # 2. Convert
             md = converter.convert(soup)
 
+            # 2.5 Corpus-wide boilerplate deduplication (optional)
+            if boilerplate_filter:
+                md = boilerplate_filter.filter(md, filename)
+
             # Skip empty content
             if not md.strip():
                 continue
@@ -81,17 +106,44 @@ def generate_markdown_content(epub_path):
             print(f"Warning: Failed to process item {href}: {e}")
             continue
 
-    return "".join(full_markdown_content), filename
+    full_markdown = "".join(full_markdown_content)
 
+    # Images were extracted in the background; swap in their final links
+    if images:
+        with images:
+            full_markdown = images.resolve_links(full_markdown)
 
-def process_epub(epub_path, output_dir):
+    return full_markdown, filename
+
+
+def get_assets_link_prefix(assets_dir, output_dir):
+    """
+    Build the link prefix for extracted images, relative to the Markdown file.
+    Percent-encoded so spaces or parentheses do not break the Markdown link.
+    Falls back to a file: URI when no relative path exists (e.g. Windows
+    paths on different drives).
+    """
+    try:
+        relative = os.path.relpath(assets_dir, output_dir)
+    except ValueError:
+        return pathlib.Path(os.path.abspath(assets_dir)).as_uri()
+    return quote(relative.replace(os.sep, "/"))
+
+
+def process_epub(epub_path, output_dir, boilerplate_filter=None, assets_dir=None):
     """
     Main orchestration function.
     """
     print(f"Processing: {epub_path}")
 
+    assets_link_prefix = "assets"
+    if assets_dir:
+        assets_link_prefix = get_assets_link_prefix(assets_dir, output_dir)
+
     try:
-        content, filename = generate_markdown_content(epub_path)
+        content, filename = generate_markdown_content(
+            epub_path, boilerplate_filter, assets_dir, assets_link_prefix
+        )
     except Exception as e:
         print(e)
         return
@@ -107,9 +159,15 @@ def process_epub(epub_path, output_dir):
         print(f"Error writing output file: {e}")
 
 
-def main():
-    import argparse
+def positive_int(value):
+    """argparse type for options that must be 1 or more."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
 
+
+def main():
     parser = argparse.ArgumentParser(
         description="Convert EPUB to Markdown for NotebookLM."
     )
@@ -120,6 +178,31 @@ def main():
         default=".",
         help="Directory to save the output Markdown file. Defaults to current directory.",
     )
+    parser.add_argument(
+        "--dedup-index",
+        help="Path to a persistent boilerplate index (SQLite) shared across books. Enables deduplication.",
+    )
+    parser.add_argument(
+        "--dedup-mode",
+        choices=["drop", "flag"],
+        default="drop",
+        help="Drop boilerplate paragraphs or flag them with an HTML comment. Defaults to drop.",
+    )
+    parser.add_argument(
+        "--dedup-min-books",
+        type=positive_int,
+        default=3,
+        help="Number of other books a paragraph must appear in to count as boilerplate. Defaults to 3.",
+    )
+    parser.add_argument(
+        "--extract-images",
+        action="store_true",
+        help="Extract images next to the Markdown and link them instead of using text placeholders.",
+    )
+    parser.add_argument(
+        "--assets-dir",
+        help="Directory for extracted images, shared across books. Defaults to <output_dir>/assets.",
+    )
 
     args = parser.parse_args()
 
@@ -131,7 +214,18 @@ def main():
             print(f"Error creating output directory: {e}")
             return
 
-    process_epub(args.epub_path, args.output_dir)
+    assets_dir = None
+    if args.extract_images:
+        assets_dir = args.assets_dir or os.path.join(args.output_dir, "assets")
+
+    if args.dedup_index:
+        with BoilerplateIndex(args.dedup_index) as index:
+            boilerplate_filter = BoilerplateFilter(
+                index, min_books=args.dedup_min_books, mode=args.dedup_mode
+            )
+            process_epub(args.epub_path, args.output_dir, boilerplate_filter, assets_dir)
+    else:
+        process_epub(args.epub_path, args.output_dir, assets_dir=assets_dir)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, unquote, urlsplit
+from xml.etree import ElementTree
+
+CHUNK_SIZE = 64 * 1024
+
+# Link target used until the image is extracted: TOKEN_PREFIX + hex digest
+TOKEN_PREFIX = "epubimg"
+TOKEN_LENGTH = 20
+
+_CONTAINER_NS = {"c": "urn:oasis:names:tc:opendocument:xmlns:container"}
+
+
+class ImageExtractor:
+    """
+    Stream images referenced by chapters from the EPUB zip into an assets
+    directory, in background threads while chapters are being converted.
+
+    Files are content-addressed (`<sha256>.<ext>`), so the same image used by
+    several chapters or books is written once. While extraction is pending,
+    the cleaner emits a token as the link target; `resolve_links` swaps the
+    tokens for the final paths once the chapter conversion is done.
+    Tokens are derived from the zip entry (name, CRC, size), so the Markdown
+    seen by later stages such as boilerplate deduplication is the same on
+    every run.
+    """
+
+    def __init__(self, epub_path, assets_dir, link_prefix="assets", max_workers=4):
+        # link_prefix is used verbatim in the Markdown, so it must already be
+        # a URL path (percent-encoded); see epub2md.get_assets_link_prefix.
+        self.epub_path = epub_path
+        self.assets_dir = assets_dir
+        self.link_prefix = link_prefix.rstrip("/")
+
+        os.makedirs(assets_dir, exist_ok=True)
+
+        # mkstemp creates files as 0600; extracted images get the same mode a
+        # plain open() would give them. Read the umask here, on the calling
+        # thread, since changing it is process-wide.
+        umask = os.umask(0)
+        os.umask(umask)
+        self._file_mode = 0o666 & ~umask
+
+        with zipfile.ZipFile(epub_path) as zf:
+            self.infos = {info.filename: info for info in zf.infolist()}
+            self.opf_dir = self._find_opf_dir(zf)
+
+        self._token_pattern = re.compile(
+            r"!\[([^\]]*)\]\((" + TOKEN_PREFIX + r"[0-9a-f]{%d})\)" % TOKEN_LENGTH
+        )
+        self._tokens = {}  # zip entry name -> token
+        self._futures = {}  # token -> Future[str] (asset file name)
+
+        self._local = threading.local()
+        self._handles = []
+        self._handles_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for zf in self._handles:
+            zf.close()
+        self._handles = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, src, chapter_href):
+        """
+        Schedule extraction of an <img src> found in `chapter_href`.
+        Returns:
+            str|None: the link token to put in the Markdown, or None if the
+            source is external or not part of the EPUB.
+        """
+        name = self._resolve(src, chapter_href)
+        if name is None:
+            return None
+
+        token = self._tokens.get(name)
+        if token is None:
+            info = self.infos[name]
+            key = f"{name}:{info.CRC:08x}:{info.file_size}".encode("utf-8")
+            token = TOKEN_PREFIX + hashlib.sha1(key).hexdigest()[:TOKEN_LENGTH]
+            self._tokens[name] = token
+            self._futures[token] = self._executor.submit(self._extract, name)
+        return token
+
+    def resolve_links(self, markdown):
+        """
+        Replace pending image tokens with links into the assets directory.
+        Images that failed to extract fall back to the text placeholder.
+        """
+
+        def replace(match):
+            alt, token = match.group(1), match.group(2)
+            if token not in self._futures:
+                return match.group(0)  # Not one of ours; leave the text alone
+            try:
+                filename = self._futures[token].result()
+            except Exception as e:
+                print(f"Warning: Failed to extract image: {e}")
+                return f"[圖片說明: {alt}]" if alt else "[圖片]"
+            return f"![{alt}]({self.link_prefix}/{quote(filename)})"
+
+        return self._token_pattern.sub(replace, markdown)
+
+    def _resolve(self, src, chapter_href):
+        """Map an <img src> relative to its chapter to a zip entry name."""
+        parts = urlsplit(src)
+        if parts.scheme or parts.netloc or not parts.path:
+            return None  # http(s):, data: etc.
+
+        chapter_path = posixpath.join(self.opf_dir, chapter_href)
+        name = posixpath.normpath(
+            posixpath.join(posixpath.dirname(chapter_path), unquote(parts.path))
+        )
+        return name if name in self.infos else None
+
+    def _zip(self):
+        """One ZipFile handle per worker thread."""
+        zf = getattr(self._local, "zf", None)
+        if zf is None:
+            zf = zipfile.ZipFile(self.epub_path)
+            self._local.zf = zf
+            with self._handles_lock:
+                self._handles.append(zf)
+        return zf
+
+    def _extract(self, name):
+        """
+        Copy one zip entry to the assets directory in fixed-size chunks,
+        hashing on the way. Returns the content-addressed file name.
+        """
+        ext = posixpath.splitext(name)[1].lower()
+        digest = hashlib.sha256()
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.assets_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out, self._zip().open(name) as src:
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+            os.chmod(tmp_path, self._file_mode)
+
+            filename = digest.hexdigest() + ext
+            final_path = os.path.join(self.assets_dir, filename)
+            if os.path.exists(final_path):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, final_path)
+            return filename
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _find_opf_dir(zf):
+        """Directory of the OPF package file; manifest hrefs are relative to it."""
+        try:
+            root = ElementTree.fromstring(zf.read("META-INF/container.xml"))
+            rootfile = root.find(".//c:rootfile", _CONTAINER_NS)
+            return posixpath.dirname(rootfile.get("full-path"))
+        except (KeyError, AttributeError, ElementTree.ParseError):
+            return ""
@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from converter import EpubConverter
+
+
+def build_table_html(rows):
+    """
+    Build a data-appendix style table with a header, colspan and rowspan cells.
+    """
+    body = []
+    for i in range(rows):
+        if i % 50 == 0:
+            body.append(f'<tr><td rowspan="2">group {i}</td><td colspan="2">section {i}</td></tr>')
+        else:
+            body.append(f'<tr><td>row {i}</td><td><b>{i}</b></td><td>{i * 3}</td></tr>')
+    return (
+        '<table><thead><tr><th>Name</th><th>Value</th><th>Total</th></tr></thead>'
+        f'<tbody>{"".join(body)}</tbody></table>'
+    )
+
+
+def run_benchmark(row_counts=(5000, 10000, 20000, 40000)):
+    """
+    Time EpubConverter.convert on growing tables.
+    Time per row should stay roughly constant (linear growth).
+    """
+    converter = EpubConverter()
+    print(f"{'rows':>8} {'seconds':>10} {'us/row':>10}")
+    for rows in row_counts:
+        soup = BeautifulSoup(build_table_html(rows), 'html.parser')
+        start = time.perf_counter()
+        converter.convert(soup)
+        elapsed = time.perf_counter() - start
+        print(f"{rows:>8} {elapsed:>10.3f} {elapsed / rows * 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -2,6 +2,7 @@ import unittest
 from bs4 import BeautifulSoup
 import sys
 import os
+import codecs
 
 # Add src to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
@@ -47,5 +48,37 @@ class TestEpubCleaner(unittest.TestCase):
         self.assertNotIn('onclick', p_tag.attrs)
         self.assertEqual(p_tag.text, "Text")
 
+    def test_remove_xml_declaration(self):
+        html = '<?xml version="1.0" encoding="utf-8"?>\n<html><body><p>Text</p></body></html>'
+        soup = EpubCleaner(html).clean()
+        self.assertNotIn("xml version", str(soup))
+
+        soup = EpubCleaner(html.encode("utf-8")).clean()
+        self.assertNotIn("xml version", str(soup))
+        self.assertEqual(soup.find('p').text, "Text")
+
+    def test_legacy_cjk_encodings(self):
+        text = "這是繁體中文測試，裡面有「引號」。"
+        big5 = ('<?xml version="1.0" encoding="big5"?>'
+                f'<html><body><p>{text}</p></body></html>').encode("big5")
+        soup = EpubCleaner(big5).clean()
+        self.assertEqual(soup.find('p').text, text)
+        self.assertNotIn("xml version", str(soup))
+
+        text = "这是简体中文测试，包含生僻字：镕。"
+        gbk = ('<html><head><meta http-equiv="Content-Type" content="text/html; charset=gb2312"/></head>'
+               f'<body><p>{text}</p></body></html>').encode("gbk")
+        soup = EpubCleaner(gbk).clean()
+        self.assertEqual(soup.find('p').text, text)
+
+    def test_bom_detection(self):
+        html = '<html><body><p>中文 UTF-16</p></body></html>'
+        data = codecs.BOM_UTF16_BE + html.encode("utf-16-be")
+        soup = EpubCleaner(data).clean()
+        self.assertEqual(soup.find('p').text, "中文 UTF-16")
+
+        self.assertEqual(EpubCleaner._detect_encoding(codecs.BOM_UTF8 + b"<p>"), "utf-8")
+        self.assertEqual(EpubCleaner._detect_encoding(b"<p>no declaration</p>"), "utf-8")
+
 if __name__ == '__main__':
     unittest.main()
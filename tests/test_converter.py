@@ -41,6 +41,40 @@ class TestEpubConverter(unittest.TestCase):
         self.assertIn("| Cell 1 | Cell 2 |", md)
         self.assertIn("| --- | --- |", md)
 
+    def test_table_colspan_rowspan(self):
+        html = (
+            "<table><thead><tr><th>A</th><th>B</th><th>C</th></tr></thead>"
+            "<tbody><tr><td rowspan=\"2\">x</td><td colspan=\"2\">wide</td></tr>"
+            "<tr><td>y</td><td>z</td></tr></tbody></table>"
+        )
+        soup = BeautifulSoup(html, 'html.parser')
+        md = self.converter.convert(soup)
+        self.assertIn("| A | B | C |\n| --- | --- | --- |", md)
+        self.assertIn("| x | wide | |", md)
+        # The rowspan cell leaves an empty cell in the next row
+        self.assertIn("| | y | z |", md)
+
+    def test_table_padded_span_values(self):
+        html = (
+            "<table><tr><th>A</th><th>B</th><th>C</th></tr>"
+            "<tr><td colspan=\" 2\">wide</td><td rowspan=\" 2 \">tall</td></tr>"
+            "<tr><td>x</td><td>y</td></tr></table>"
+        )
+        soup = BeautifulSoup(html, 'html.parser')
+        md = self.converter.convert(soup)
+        self.assertIn("| wide | | tall |", md)
+        self.assertIn("| x | y | |", md)
+
+    def test_large_table_rows(self):
+        rows = "".join(f"<tr><td>r{i}</td><td>v {i}</td></tr>" for i in range(2000))
+        html = f"<table><tr><th>Key</th><th>Value</th></tr>{rows}</table>"
+        soup = BeautifulSoup(html, 'html.parser')
+        md = self.converter.convert(soup)
+        lines = md.splitlines()
+        self.assertEqual(len(lines), 2002)
+        self.assertEqual(lines[1], "| --- | --- |")
+        self.assertEqual(lines[-1], "| r1999 | v 1999 |")
+
     def test_code_blocks(self):
         html = '<pre><code>print("Hello World")</code></pre>'
         soup = BeautifulSoup(html, 'html.parser')
@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from deduplicator import BoilerplateIndex, BoilerplateFilter
+
+COPYRIGHT = "All rights reserved. No part of this publication may be reproduced without permission."
+COPYRIGHT_VARIANT = "All rights reserved. No part of this publication may be reproduced without permission!"
+
+
+class TestBoilerplateFilter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "index.sqlite")
+        self.index = BoilerplateIndex(self.db_path)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmpdir.cleanup()
+
+    BODIES = {
+        "A": "The quick brown fox jumps over the lazy dog near the riverbank.",
+        "B": "Quantum entanglement links particles across arbitrary distances.",
+        "C": "敏捷的棕色狐狸跳過了那隻懶惰的狗，然後消失在森林的深處之中。",
+    }
+
+    def _chapter(self, book):
+        return f"# Chapter 1\n\n{COPYRIGHT}\n\n{self.BODIES[book]}"
+
+    def test_drop_after_min_books(self):
+        dedup = BoilerplateFilter(self.index, min_books=2)
+        self.assertIn(COPYRIGHT, dedup.filter(self._chapter("A"), "book_a"))
+        self.assertIn(COPYRIGHT, dedup.filter(self._chapter("B"), "book_b"))
+
+        md = dedup.filter(self._chapter("C"), "book_c")
+        self.assertNotIn(COPYRIGHT, md)
+        # Headings and unique text are kept
+        self.assertIn("# Chapter 1", md)
+        self.assertIn(self.BODIES["C"], md)
+
+    def test_same_book_counted_once(self):
+        dedup = BoilerplateFilter(self.index, min_books=2)
+        for _ in range(3):
+            md = dedup.filter(self._chapter("A"), "book_a")
+        self.assertIn(COPYRIGHT, md)
+
+    def test_reconverting_books_does_not_inflate_count(self):
+        dedup = BoilerplateFilter(self.index, min_books=2)
+        for _ in range(2):
+            for book in ("A", "B"):
+                md = dedup.filter(self._chapter(book), f"book_{book}")
+                self.assertIn(COPYRIGHT, md)
+
+    def test_own_book_not_counted(self):
+        dedup = BoilerplateFilter(self.index, min_books=2)
+        dedup.filter(COPYRIGHT, "other")
+        chapters = [dedup.filter(COPYRIGHT, "mine") for _ in range(3)]
+        self.assertEqual(chapters, [COPYRIGHT] * 3)
+
+        # With one other book required, every chapter gets the same decision
+        dedup = BoilerplateFilter(self.index, min_books=1)
+        self.assertEqual([dedup.filter(COPYRIGHT, "mine") for _ in range(2)], ["", ""])
+
+    def test_flag_near_duplicate(self):
+        dedup = BoilerplateFilter(self.index, min_books=1, mode="flag")
+        dedup.filter(COPYRIGHT, "book_a")
+        md = dedup.filter(COPYRIGHT_VARIANT, "book_b")
+        self.assertEqual(md, f"{BoilerplateFilter.FLAG}\n{COPYRIGHT_VARIANT}")
+
+    def test_index_is_persistent(self):
+        BoilerplateFilter(self.index, min_books=1).filter(COPYRIGHT, "book_a")
+        self.index.close()
+
+        self.index = BoilerplateIndex(self.db_path)
+        md = BoilerplateFilter(self.index, min_books=1).filter(COPYRIGHT, "book_b")
+        self.assertEqual(md, "")
+
+    def test_invalid_min_books(self):
+        for min_books in (0, -1):
+            with self.assertRaises(ValueError):
+                BoilerplateFilter(self.index, min_books=min_books)
+
+    def test_code_blocks_untouched(self):
+        dedup = BoilerplateFilter(self.index, min_books=1)
+        code = f"```\n{COPYRIGHT}\n\n{COPYRIGHT}\n```"
+        dedup.filter(code, "book_a")
+        self.assertEqual(dedup.filter(code, "book_b"), code)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+from ebooklib import epub
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from cleaner import EpubCleaner
+from converter import EpubConverter
+from image_extractor import ImageExtractor
+from epub2md import get_assets_link_prefix
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"fake image data" * 100
+
+
+def create_image_epub(filename):
+    book = epub.EpubBook()
+    book.set_identifier('img123')
+    book.set_title('Image Book')
+    book.set_language('en')
+
+    c1 = epub.EpubHtml(title='One', file_name='text/chap01.xhtml', lang='en')
+    c1.content = '<h1>One</h1><p><img src="../images/fig%201.png" alt="Figure [1]"/></p>'
+    book.add_item(c1)
+
+    # Same bytes under another name: must be stored once
+    book.add_item(epub.EpubItem(uid='fig1', file_name='images/fig 1.png', media_type='image/png', content=PNG_BYTES))
+    book.add_item(epub.EpubItem(uid='fig2', file_name='images/copy.png', media_type='image/png', content=PNG_BYTES))
+
+    book.toc = (epub.Link('text/chap01.xhtml', 'One', 'one'),)
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.spine = [c1]
+    epub.write_epub(filename, book, {})
+
+
+class TestImageExtractor(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.epub_path = os.path.join(self.tmpdir.name, 'images.epub')
+        self.assets_dir = os.path.join(self.tmpdir.name, 'assets')
+        create_image_epub(self.epub_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _convert(self, images, html, href='text/chap01.xhtml'):
+        resolver = lambda src: images.submit(src, href)
+        soup = EpubCleaner(html, image_resolver=resolver).clean()
+        return EpubConverter().convert(soup)
+
+    def test_image_link_and_dedup(self):
+        with ImageExtractor(self.epub_path, self.assets_dir) as images:
+            md = self._convert(
+                images,
+                '<p><img src="../images/fig%201.png" alt="Figure [1]"/></p>'
+                '<p><img src="../images/copy.png"/></p>',
+            )
+            md = images.resolve_links(md)
+
+        files = os.listdir(self.assets_dir)
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].endswith('.png'))
+        with open(os.path.join(self.assets_dir, files[0]), 'rb') as f:
+            self.assertEqual(f.read(), PNG_BYTES)
+
+        self.assertIn(f"![Figure 1](assets/{files[0]})", md)
+        self.assertIn(f"![](assets/{files[0]})", md)
+
+    @unittest.skipIf(os.name == 'nt', "POSIX file modes only")
+    def test_extracted_file_mode_follows_umask(self):
+        old_umask = os.umask(0o022)
+        try:
+            with ImageExtractor(self.epub_path, self.assets_dir) as images:
+                images.resolve_links(self._convert(images, '<p><img src="../images/copy.png"/></p>'))
+        finally:
+            os.umask(old_umask)
+
+        (filename,) = os.listdir(self.assets_dir)
+        mode = os.stat(os.path.join(self.assets_dir, filename)).st_mode & 0o777
+        self.assertEqual(mode, 0o644)
+
+    def test_tokens_are_deterministic(self):
+        html = '<p>See the figure <img src="../images/fig%201.png" alt="Figure"/> for details.</p>'
+        runs = []
+        for _ in range(2):
+            with ImageExtractor(self.epub_path, self.assets_dir) as images:
+                runs.append(self._convert(images, html))
+        # Later stages (e.g. boilerplate dedup) see identical text on every run
+        self.assertEqual(runs[0], runs[1])
+        self.assertIn("![Figure](epubimg", runs[0])
+
+    def test_link_prefix_is_escaped(self):
+        out_dir = os.path.join(self.tmpdir.name, 'out')
+        assets_dir = os.path.join(self.tmpdir.name, 'my assets (1)')
+        prefix = get_assets_link_prefix(assets_dir, out_dir)
+        self.assertEqual(prefix, '../my%20assets%20%281%29')
+
+        with ImageExtractor(self.epub_path, assets_dir, prefix) as images:
+            md = images.resolve_links(self._convert(images, '<p><img src="../images/copy.png"/></p>'))
+        (filename,) = os.listdir(assets_dir)
+        self.assertIn(f"![](../my%20assets%20%281%29/{filename})", md)
+
+    def test_link_prefix_without_relative_path(self):
+        # os.path.relpath raises ValueError across Windows drives
+        with mock.patch('os.path.relpath', side_effect=ValueError):
+            prefix = get_assets_link_prefix(os.path.join(self.tmpdir.name, 'my assets'), 'out')
+        self.assertTrue(prefix.startswith('file:'))
+        self.assertTrue(prefix.endswith('/my%20assets'))
+
+    def test_images_in_code_keep_placeholder(self):
+        with ImageExtractor(self.epub_path, self.assets_dir) as images:
+            md = self._convert(
+                images,
+                '<pre><code>x <img src="../images/copy.png"/></code></pre>'
+                '<p><code><img src="../images/fig%201.png" alt="Fig"/></code></p>',
+            )
+            md = images.resolve_links(md)
+
+        self.assertNotIn("![", md)
+        self.assertIn("[圖片]", md)
+        self.assertIn("[圖片說明: Fig]", md)
+        self.assertEqual(os.listdir(self.assets_dir), [])
+
+    def test_unresolvable_images_keep_placeholder(self):
+        with ImageExtractor(self.epub_path, self.assets_dir) as images:
+            md = self._convert(
+                images,
+                '<p><img src="http://example.com/a.png" alt="Remote"/>'
+                '<img src="../images/missing.png"/></p>',
+            )
+            md = images.resolve_links(md)
+
+        self.assertIn("[圖片說明: Remote]", md)
+        self.assertIn("[圖片]", md)
+        self.assertEqual(os.listdir(self.assets_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()